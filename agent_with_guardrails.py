@@ -6,78 +6,203 @@ This demonstrates using the openai-agents SDK where:
 - OpenAI guardrails are applied for safety and validation
 """
 
-import os
+import asyncio
+import hashlib
+import logging
+import sys
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 from agents import Agent, ModelSettings, InputGuardrail, OutputGuardrail, RunContextWrapper
+import fastjson
+from keyloader import load_api_keys
+from memory import trim
 
 load_dotenv()
 
-
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
-
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
+log = logging.getLogger(__name__)
 
 
 # Initialize OpenAI client for Mercury (Inception Labs)
 inception_key, openai_key = load_api_keys()
 
 # Create OpenAI client pointing to Inception Labs
-mercury_client = OpenAI(
+mercury_client = AsyncOpenAI(
     api_key=inception_key,
     base_url="https://api.inceptionlabs.ai/v1"
 )
 
 # Create standard OpenAI client for guardrails
-openai_client = OpenAI(api_key=openai_key)
+openai_client = AsyncOpenAI(api_key=openai_key)
+
+
+class TokenBucket:
+    """
+    Client-side requests-per-minute / tokens-per-minute budget.
+
+    Modeled on the OpenAI Cookbook's api_request_parallel_processor:
+    capacity refills continuously at the per-minute rates, and callers
+    wait for capacity before sending instead of discovering the limit
+    through 429 responses and retry backoff.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.available_requests = float(rpm)
+        self.available_tokens = float(tpm)
+        self.last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.available_requests = min(self.rpm, self.available_requests + self.rpm * elapsed / 60)
+        self.available_tokens = min(self.tpm, self.available_tokens + self.tpm * elapsed / 60)
+        self.last_update = now
+
+    async def acquire(self, tokens: int):
+        """Wait until one request and the estimated tokens are available."""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+
+                # Sleep just long enough for the scarcer budget to refill
+                await asyncio.sleep(max(
+                    (1 - self.available_requests) * 60 / self.rpm,
+                    (tokens - self.available_tokens) * 60 / self.tpm
+                ))
+
+
+# One budget per API; adjust to your account's rate-limit tier
+_OPENAI_BUCKET = TokenBucket(rpm=500, tpm=200_000)
+_MERCURY_BUCKET = TokenBucket(rpm=100, tpm=100_000)
+
+
+def _estimate_tokens(request: dict) -> int:
+    """Roughly estimate request tokens at ~4 characters per token."""
+    if "messages" in request:
+        texts = [message.get("content") or "" for message in request["messages"]]
+    else:
+        texts = request.get("input", "")
+        if isinstance(texts, str):
+            texts = [texts]
+    return sum(len(text) for text in texts) // 4 + request.get("max_tokens", 0)
+
+
+async def call_openai(create, bucket: TokenBucket, **kwargs):
+    """Call an API create method once the rate-limit bucket has capacity."""
+    await bucket.acquire(_estimate_tokens(kwargs))
+    return await create(**kwargs)
+
+
+# Bounded LRU memo of guardrail verdicts keyed by (model, input hash), so
+# repeated text is answered locally instead of with another API round-trip
+_CACHE_MAXSIZE = 4096
+_MOD_CACHE: "OrderedDict[tuple[str, str], tuple[tuple[str, ...], float]]" = OrderedDict()
+_VALIDATION_CACHE: "OrderedDict[tuple[str, str], dict]" = OrderedDict()
+
+
+def _cache_key(model: str, text: str) -> tuple[str, str]:
+    return model, hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _cache_get(cache: OrderedDict, key: tuple[str, str]):
+    """Return the cached value for key (marking it recently used), or None."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key: tuple[str, str], value) -> None:
+    cache[key] = value
+    if len(cache) > _CACHE_MAXSIZE:
+        cache.popitem(last=False)
+
+
+def _verdict(result) -> tuple[tuple[str, ...], float]:
+    """Return the flagged categories and highest category score of a moderation result."""
+    # Read the model fields directly rather than via model_dump(), and only
+    # look at categories when something was actually flagged
+    flagged_categories = tuple(
+        category for category, flagged in vars(result.categories).items()
+        if flagged is True
+    ) if result.flagged else ()
+    return flagged_categories, max(vars(result.category_scores).values(), default=0.0)
+
+
+async def _moderate(client: AsyncOpenAI, text: str) -> tuple[tuple[str, ...], float]:
+    """Moderate text, returning its flagged categories (empty if clean) and top score."""
+    key = _cache_key("omni-moderation-latest", text)
+    verdict = _cache_get(_MOD_CACHE, key)
+    if verdict is None:
+        moderation_response = await call_openai(
+            client.moderations.create,
+            _OPENAI_BUCKET,
+            input=text,
+            model="omni-moderation-latest"
+        )
+        verdict = _verdict(moderation_response.results[0])
+        _cache_put(_MOD_CACHE, key, verdict)
+    return verdict
+
+
+async def moderate_many(client: AsyncOpenAI, texts: list[str]) -> list[tuple[tuple[str, ...], float]]:
+    """
+    Moderate several texts with a single API request.
+
+    Returns a (flagged categories, top score) verdict per text, in order.
+    Texts with a cached verdict are not sent. If the request fails, the
+    uncached texts are allowed, like the other guardrail checks.
+    """
+    keys = [_cache_key("omni-moderation-latest", text) for text in texts]
+    verdicts = [_cache_get(_MOD_CACHE, key) for key in keys]
+    misses = [i for i, verdict in enumerate(verdicts) if verdict is None]
+
+    if not misses:
+        return verdicts
+
+    try:
+        moderation_response = await call_openai(
+            client.moderations.create,
+            _OPENAI_BUCKET,
+            input=[texts[i] for i in misses],
+            model="omni-moderation-latest"
+        )
+
+        for i, result in zip(misses, moderation_response.results):
+            verdicts[i] = _verdict(result)
+            _cache_put(_MOD_CACHE, keys[i], verdicts[i])
+
+        return verdicts
+
+    except Exception as e:
+        log.warning(f"⚠️ Guardrail check error: {e}")
+        # In production, you might want to block on errors
+        return [verdict or ((), 0.0) for verdict in verdicts]
 
 
 # Custom Input Guardrail using OpenAI for safety checking
 class OpenAIContentSafetyGuardrail(InputGuardrail):
     """Check user input for inappropriate content using OpenAI moderation."""
 
-    def __init__(self, client: OpenAI):
+    def __init__(self, client: AsyncOpenAI):
         self.client = client
 
-    def validate(self, context: RunContextWrapper, input_str: str) -> str:
+    async def validate(self, context: RunContextWrapper, input_str: str) -> str:
         """Validate input using OpenAI moderation API."""
         try:
             # Use OpenAI moderation endpoint
-            moderation_response = self.client.moderations.create(
-                input=input_str,
-                model="omni-moderation-latest"
-            )
-
-            result = moderation_response.results[0]
+            flagged_categories, _ = await _moderate(self.client, input_str)
 
-            if result.flagged:
-                # Find which categories were flagged
-                flagged_categories = [
-                    category for category, flagged in result.categories.model_dump().items()
-                    if flagged
-                ]
+            if flagged_categories:
                 raise ValueError(
                     f"Input violates content policy. Flagged categories: {', '.join(flagged_categories)}"
                 )
@@ -85,73 +210,200 @@ class OpenAIContentSafetyGuardrail(InputGuardrail):
             return input_str
 
         except Exception as e:
-            print(f"⚠️ Guardrail check error: {e}")
+            log.warning(f"⚠️ Guardrail check error: {e}")
             # In production, you might want to block on errors
             return input_str
 
+    @classmethod
+    async def validate_batch(cls, client: AsyncOpenAI, inputs: list[str]) -> list[tuple[str, ...]]:
+        """
+        Moderate many inputs with a single API request.
 
-# Custom Output Guardrail to validate responses
-class OpenAIResponseValidationGuardrail(OutputGuardrail):
-    """Validate agent output using OpenAI to ensure quality and appropriateness."""
-
-    def __init__(self, client: OpenAI):
-        self.client = client
-
-    def validate(self, context: RunContextWrapper, output: str) -> str:
-        """Validate output using OpenAI."""
-        try:
-            # Check for inappropriate content in output
-            moderation_response = self.client.moderations.create(
-                input=output,
-                model="omni-moderation-latest"
-            )
+        Returns the flagged categories for each input, in order; an empty
+        tuple means the input passed. Inputs with a cached verdict are not
+        sent to the API.
+        """
+        verdicts = await moderate_many(client, inputs)
+        return [flagged_categories for flagged_categories, _ in verdicts]
 
-            result = moderation_response.results[0]
 
-            if result.flagged:
-                flagged_categories = [
-                    category for category, flagged in result.categories.model_dump().items()
-                    if flagged
-                ]
-                return f"[Response blocked by guardrails due to: {', '.join(flagged_categories)}]"
-
-            # Additional validation: check if response is helpful
-            validation_prompt = f"""Evaluate if this response is helpful and appropriate:
+# Output validation prompt and request settings, built once at import
+_VAL_TPL = """Evaluate if this response is safe, helpful and appropriate:
 Response: {output}
 
-Answer with just 'YES' if helpful and appropriate, or 'NO' with a brief reason if not."""
+Return JSON {{"safe": bool, "helpful": bool, "reason": str}}, with a brief reason if either is false."""
+_VAL_KW = dict(
+    model="gpt-4o-mini",
+    response_format={"type": "json_object"},
+    max_tokens=100
+)
+
 
-            validation = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": validation_prompt}],
-                max_tokens=50
+# Custom Output Guardrail to validate responses
+class OpenAIResponseValidationGuardrail(OutputGuardrail):
+    """
+    Validate agent output using OpenAI to ensure quality and appropriateness.
+
+    With enable_llm_check, a single gpt-4o-mini call judges both safety and
+    helpfulness, and moderation only runs to confirm output the model
+    reports as unsafe. Otherwise output is moderated, and the LLM check
+    only runs when a moderation category score exceeds score_threshold, so
+    clean output costs a single API call either way.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        enable_llm_check: bool = False,
+        score_threshold: float = 0.3,
+        timeout: float = 10.0
+    ):
+        self.client = client
+        self.enable_llm_check = enable_llm_check
+        self.score_threshold = score_threshold
+        self.timeout = timeout
+
+    async def _llm_check(self, output: str) -> dict:
+        """Ask gpt-4o-mini to judge output; returns {"safe", "helpful", "reason"}."""
+        key = _cache_key(_VAL_KW["model"], output)
+        verdict = _cache_get(_VALIDATION_CACHE, key)
+        if verdict is None:
+            validation = await call_openai(
+                self.client.chat.completions.create,
+                _OPENAI_BUCKET,
+                messages=[{"role": "user", "content": _VAL_TPL.format(output=output)}],
+                timeout=self.timeout,
+                **_VAL_KW
             )
 
-            validation_result = validation.choices[0].message.content.strip()
+            verdict = fastjson.loads(validation.choices[0].message.content)
+            _cache_put(_VALIDATION_CACHE, key, verdict)
+        return verdict
+
+    async def validate(
+        self,
+        context: RunContextWrapper,
+        output: str,
+        moderation: tuple[tuple[str, ...], float] | None = None
+    ) -> str:
+        """
+        Validate output using OpenAI.
+
+        moderation is an optional verdict from moderate_many() already
+        computed for this output, which saves the moderation request.
+        """
+        try:
+            if self.enable_llm_check:
+                verdict = await self._llm_check(output)
+                flagged_categories = ()
+                if not verdict.get("safe", True):
+                    # Confirm with moderation to name the violated categories
+                    flagged_categories, _ = moderation or await _moderate(self.client, output)
+                    flagged_categories = flagged_categories or (verdict.get("reason") or "unsafe content",)
+            else:
+                flagged_categories, max_score = moderation or await _moderate(self.client, output)
+                verdict = None
+
+                # Clean, non-borderline output skips the LLM check
+                if not flagged_categories and max_score > self.score_threshold:
+                    verdict = await self._llm_check(output)
+                    if not verdict.get("safe", True):
+                        flagged_categories = (verdict.get("reason") or "unsafe content",)
+
+            if flagged_categories:
+                return f"[Response blocked by guardrails due to: {', '.join(flagged_categories)}]"
 
-            if validation_result.startswith("NO"):
-                print(f"⚠️ Response validation: {validation_result}")
+            if verdict and not verdict.get("helpful", True):
+                log.warning(f"⚠️ Response validation: {verdict.get('reason', '')}")
                 # In production, might want to regenerate or block
                 return output + "\n\n[Note: Response quality flagged for review]"
 
             return output
 
         except Exception as e:
-            print(f"⚠️ Output guardrail error: {e}")
+            log.warning(f"⚠️ Output guardrail error: {e}")
             return output
 
 
+# Guardrails hold no per-query state, so a single instance is shared. Input
+# checks go through the batched moderation helpers, so only the output
+# guardrail needs an instance.
+_OUTPUT_GUARD = OpenAIResponseValidationGuardrail(openai_client)
+
+# New output characters between incremental moderation checks while streaming
+_STREAM_CHECK_CHARS = 200
+
+
+async def generate_with_guardrail(
+    messages: list[dict],
+    max_tokens: int,
+    validate_output: bool = True
+) -> tuple[str, str | None]:
+    """
+    Stream a Mercury completion while the output guardrail runs alongside it.
+
+    Every _STREAM_CHECK_CHARS characters, the text so far is moderated in a
+    background task so the check overlaps generation. If a check flags the
+    partial output, the stream is closed early. Otherwise the complete
+    output goes through the full output guardrail, unless validate_output
+    is False, in which case the caller validates it later.
+
+    Returns (output, validated_output); validated_output is None when the
+    output was neither blocked nor validated.
+    """
+    stream = await call_openai(
+        mercury_client.chat.completions.create,
+        _MERCURY_BUCKET,
+        model="mercury",
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True
+    )
+
+    parts = []
+    length = checked_length = 0
+    checks = []
+
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            parts.append(delta)
+            length += len(delta)
+
+            if length - checked_length >= _STREAM_CHECK_CHARS:
+                checked_length = length
+                checks.append(asyncio.create_task(_moderate(openai_client, "".join(parts))))
+
+            for check in checks:
+                if check.done() and not check.exception() and check.result()[0]:
+                    # Stop generating as soon as the partial output is flagged
+                    await stream.close()
+                    flagged_categories = check.result()[0]
+                    return "".join(parts), f"[Response blocked by guardrails due to: {', '.join(flagged_categories)}]"
+    finally:
+        # The full validation below supersedes any partial check still in flight
+        for check in checks:
+            check.cancel()
+
+    output = "".join(parts)
+    if not validate_output:
+        return output, None
+    return output, await _OUTPUT_GUARD.validate(None, output)
+
+
 # Example 1: Basic Agent with Guardrails
-def basic_agent_with_guardrails():
-    print("=== Example 1: Agent with Input/Output Guardrails ===\n")
+async def basic_agent_with_guardrails():
+    log.info("=== Example 1: Agent with Input/Output Guardrails ===\n")
 
     # Since the agents SDK doesn't directly support custom providers,
     # we'll use the Mercury client directly with agent-like patterns
 
-    print("Creating agent with:")
-    print("- Backend: Inception Labs Mercury model")
-    print("- Input Guardrail: OpenAI content safety")
-    print("- Output Guardrail: OpenAI response validation\n")
+    log.info("Creating agent with:")
+    log.info("- Backend: Inception Labs Mercury model")
+    log.info("- Input Guardrail: OpenAI content safety")
+    log.info("- Output Guardrail: OpenAI response validation\n")
 
     # Test queries
     queries = [
@@ -160,43 +412,53 @@ def basic_agent_with_guardrails():
         "Tell me about Python programming."
     ]
 
-    for query in queries:
-        print(f"User: {query}")
+    # Queries are known upfront, so moderate all of them in one request
+    verdicts = await OpenAIContentSafetyGuardrail.validate_batch(openai_client, queries)
+
+    async def process(query, flagged_categories):
+        # Collect this query's lines and emit them after gather() so output
+        # from concurrent queries is not interleaved
+        lines = [f"User: {query}"]
 
         # Input guardrail check
-        try:
-            input_guardrail = OpenAIContentSafetyGuardrail(openai_client)
-            validated_input = input_guardrail.validate(None, query)
-        except ValueError as e:
-            print(f"❌ Input blocked by guardrail: {e}\n")
-            continue
+        if flagged_categories:
+            lines.append(
+                "❌ Input blocked by guardrail: Input violates content policy. "
+                f"Flagged categories: {', '.join(flagged_categories)}\n"
+            )
+            return lines
 
-        # Call Mercury model
+        # Call Mercury model, with the output guardrail checking as it streams
         try:
-            response = mercury_client.chat.completions.create(
-                model="mercury",
-                messages=[
+            _, validated_output = await generate_with_guardrail(
+                [
                     {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": validated_input}
+                    {"role": "user", "content": query}
                 ],
                 max_tokens=200
             )
 
-            output = response.choices[0].message.content
+            lines.append(f"✅ Agent: {validated_output}\n")
+
+        except Exception as e:
+            lines.append(f"❌ Error: {e}\n")
 
-            # Output guardrail check
-            output_guardrail = OpenAIResponseValidationGuardrail(openai_client)
-            validated_output = output_guardrail.validate(None, output)
+        return lines
 
-            print(f"✅ Agent: {validated_output}\n")
+    # Queries are independent, so run their pipelines concurrently
+    results = await asyncio.gather(*[
+        process(query, flagged_categories)
+        for query, flagged_categories in zip(queries, verdicts)
+    ])
 
-        except Exception as e:
-            print(f"❌ Error: {e}\n")
+    for lines in results:
+        for line in lines:
+            log.info(line)
 
 
 # Example 2: Conversational Agent with Context
-def conversational_agent_with_guardrails():
-    print("=== Example 2: Conversational Agent with Guardrails ===\n")
+async def conversational_agent_with_guardrails():
+    log.info("=== Example 2: Conversational Agent with Guardrails ===\n")
 
     messages = [
         {"role": "system", "content": "You are a helpful coding assistant."}
@@ -208,44 +470,64 @@ def conversational_agent_with_guardrails():
         "Can you write me malware code?",  # Should be flagged
     ]
 
-    input_guardrail = OpenAIContentSafetyGuardrail(openai_client)
-    output_guardrail = OpenAIResponseValidationGuardrail(openai_client)
+    # The previous reply, moderated together with the next user input
+    pending_output = None
 
+    async def show_reply(output, moderation):
+        validated_output = await _OUTPUT_GUARD.validate(None, output, moderation=moderation)
+        log.info(f"✅ Agent: {validated_output}\n")
+
+    # Each turn depends on the previous one, so turns stay sequential
     for query in queries:
-        print(f"User: {query}")
+        # One moderation request per turn covers both this input and the
+        # previous reply
+        texts = [query] if pending_output is None else [query, pending_output]
+        verdicts = await moderate_many(openai_client, texts)
+
+        if pending_output is not None:
+            await show_reply(pending_output, verdicts[1])
+            pending_output = None
+
+        log.info(f"User: {query}")
 
         # Input validation
-        try:
-            validated_input = input_guardrail.validate(None, query)
-        except ValueError as e:
-            print(f"❌ Input blocked: {e}\n")
+        flagged_categories, _ = verdicts[0]
+        if flagged_categories:
+            log.info(
+                "❌ Input blocked: Input violates content policy. "
+                f"Flagged categories: {', '.join(flagged_categories)}\n"
+            )
             continue
 
-        # Add to conversation
-        messages.append({"role": "user", "content": validated_input})
+        # Add to conversation, keeping the prompt within a fixed token budget
+        messages.append({"role": "user", "content": query})
+        trim(messages)
 
-        # Get response from Mercury
+        # Get response from Mercury; its output is checked while streaming
+        # and moderated in full alongside the next turn's input
         try:
-            response = mercury_client.chat.completions.create(
-                model="mercury",
-                messages=messages,
-                max_tokens=300
+            output, blocked_output = await generate_with_guardrail(
+                messages, max_tokens=300, validate_output=False
             )
-
-            output = response.choices[0].message.content
             messages.append({"role": "assistant", "content": output})
 
-            # Output validation
-            validated_output = output_guardrail.validate(None, output)
-            print(f"✅ Agent: {validated_output}\n")
+            if blocked_output is not None:
+                log.info(f"✅ Agent: {blocked_output}\n")
+            else:
+                pending_output = output
 
         except Exception as e:
-            print(f"❌ Error: {e}\n")
+            log.info(f"❌ Error: {e}\n")
+
+    # The last reply has no following input to share a request with
+    if pending_output is not None:
+        [verdict] = await moderate_many(openai_client, [pending_output])
+        await show_reply(pending_output, verdict)
 
 
 # Example 3: Show Guardrail Protection
-def demonstrate_guardrails():
-    print("=== Example 3: Demonstrating Guardrail Protection ===\n")
+async def demonstrate_guardrails():
+    log.info("=== Example 3: Demonstrating Guardrail Protection ===\n")
 
     test_cases = [
         ("Safe query", "What's the weather like today?"),
@@ -253,40 +535,53 @@ def demonstrate_guardrails():
         ("Safe technical", "Explain how encryption works"),
     ]
 
-    input_guardrail = OpenAIContentSafetyGuardrail(openai_client)
+    # One moderation request scores every test case
+    verdicts = await OpenAIContentSafetyGuardrail.validate_batch(
+        openai_client, [query for _, query in test_cases]
+    )
 
-    for label, query in test_cases:
-        print(f"🧪 Testing: {label}")
-        print(f"Query: {query}")
+    for (label, query), flagged_categories in zip(test_cases, verdicts):
+        log.info(f"🧪 Testing: {label}")
+        log.info(f"Query: {query}")
 
-        try:
-            validated = input_guardrail.validate(None, query)
-            print(f"✅ Passed guardrails\n")
-        except ValueError as e:
-            print(f"❌ Blocked by guardrails: {e}\n")
+        if flagged_categories:
+            log.info(
+                "❌ Blocked by guardrails: Input violates content policy. "
+                f"Flagged categories: {', '.join(flagged_categories)}\n"
+            )
+        else:
+            log.info(f"✅ Passed guardrails\n")
 
 
-if __name__ == "__main__":
-    try:
-        print("=" * 70)
-        print("OpenAI Agent with Inception Mercury + OpenAI Guardrails")
-        print("=" * 70)
-        print()
+async def main():
+    log.info("=" * 70)
+    log.info("OpenAI Agent with Inception Mercury + OpenAI Guardrails")
+    log.info("=" * 70)
+    log.info("")
+
+    await basic_agent_with_guardrails()
+    log.info("-" * 70 + "\n")
+
+    await conversational_agent_with_guardrails()
+    log.info("-" * 70 + "\n")
 
-        basic_agent_with_guardrails()
-        print("-" * 70 + "\n")
+    await demonstrate_guardrails()
 
-        conversational_agent_with_guardrails()
-        print("-" * 70 + "\n")
+    log.info("=" * 70)
+    log.info("All examples completed!")
+    log.info("=" * 70)
 
-        demonstrate_guardrails()
 
-        print("=" * 70)
-        print("All examples completed!")
-        print("=" * 70)
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    try:
+        asyncio.run(main())
 
     except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
-        print("\nMake sure you have both API keys in your .key file")
+        log.exception(f"Error: {e}")
+        log.info("\nMake sure you have both API keys in your .key file")
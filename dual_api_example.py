@@ -1,64 +1,52 @@
-import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import httpx
 from dotenv import load_dotenv
 from swarm import Swarm, Agent
 from openai import OpenAI
+from keyloader import load_api_keys
+from memory import trim
 
 # Load environment variables
 load_dotenv()
 
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
+# Keys are read once at import and shared by the client factories below
+_INCEPTION_KEY, _OPENAI_KEY = load_api_keys()
 
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    # Fall back to environment variables if not found in file
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
+
+def _pooled_http_client() -> httpx.Client:
+    """HTTP client with a keep-alive pool larger than the httpx default."""
+    return httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=32),
+        timeout=60
+    )
 
 
 # Create Swarm client for Inception Labs
+# Memoized so every example reuses the same connection pool and TLS session
+@lru_cache(maxsize=1)
 def create_inception_swarm_client():
     """Create Swarm client configured for Inception Labs API."""
-    inception_api_key, _ = load_api_keys()
     inception_base_url = "https://api.inceptionlabs.ai/v1"
 
     client = OpenAI(
-        api_key=inception_api_key,
-        base_url=inception_base_url
+        api_key=_INCEPTION_KEY,
+        base_url=inception_base_url,
+        http_client=_pooled_http_client()
     )
 
     return Swarm(client=client)
 
 
 # Create Swarm client for OpenAI
+@lru_cache(maxsize=1)
 def create_openai_swarm_client():
     """Create Swarm client configured for OpenAI API."""
-    _, openai_api_key = load_api_keys()
-
     client = OpenAI(
-        api_key=openai_api_key
+        api_key=_OPENAI_KEY,
         # No base_url needed - uses default OpenAI endpoint
+        http_client=_pooled_http_client()
     )
 
     return Swarm(client=client)
@@ -70,33 +58,42 @@ def compare_simple_responses():
 
     question = "What is the capital of France?"
 
-    # Test with Inception Labs
-    print("🔵 Using Inception Labs (Mercury model):")
     inception_agent = Agent(
         name="Inception Assistant",
         model="mercury",
         instructions="You are a helpful AI assistant."
     )
     inception_client = create_inception_swarm_client()
-    inception_response = inception_client.run(
-        agent=inception_agent,
-        messages=[{"role": "user", "content": question}]
-    )
-    print(f"Q: {question}")
-    print(f"A: {inception_response.messages[-1]['content']}\n")
 
-    # Test with OpenAI
-    print("🟢 Using OpenAI (GPT-4 model):")
     openai_agent = Agent(
         name="OpenAI Assistant",
         model="gpt-4",
         instructions="You are a helpful AI assistant."
     )
     openai_client = create_openai_swarm_client()
-    openai_response = openai_client.run(
-        agent=openai_agent,
-        messages=[{"role": "user", "content": question}]
-    )
+
+    # The two APIs are independent, so query them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        inception_future = executor.submit(
+            inception_client.run,
+            agent=inception_agent,
+            messages=[{"role": "user", "content": question}]
+        )
+        openai_future = executor.submit(
+            openai_client.run,
+            agent=openai_agent,
+            messages=[{"role": "user", "content": question}]
+        )
+        inception_response = inception_future.result()
+        openai_response = openai_future.result()
+
+    # Test with Inception Labs
+    print("🔵 Using Inception Labs (Mercury model):")
+    print(f"Q: {question}")
+    print(f"A: {inception_response.messages[-1]['content']}\n")
+
+    # Test with OpenAI
+    print("🟢 Using OpenAI (GPT-4 model):")
     print(f"Q: {question}")
     print(f"A: {openai_response.messages[-1]['content']}\n")
 
@@ -112,8 +109,6 @@ def compare_tool_usage():
 
     question = "What's the weather in Tokyo?"
 
-    # Test with Inception Labs
-    print("🔵 Using Inception Labs with tools:")
     inception_agent = Agent(
         name="Inception Assistant",
         model="mercury",
@@ -121,15 +116,7 @@ def compare_tool_usage():
         functions=[get_weather]
     )
     inception_client = create_inception_swarm_client()
-    inception_response = inception_client.run(
-        agent=inception_agent,
-        messages=[{"role": "user", "content": question}]
-    )
-    print(f"Q: {question}")
-    print(f"A: {inception_response.messages[-1]['content']}\n")
 
-    # Test with OpenAI
-    print("🟢 Using OpenAI with tools:")
     openai_agent = Agent(
         name="OpenAI Assistant",
         model="gpt-4",
@@ -137,10 +124,29 @@ def compare_tool_usage():
         functions=[get_weather]
     )
     openai_client = create_openai_swarm_client()
-    openai_response = openai_client.run(
-        agent=openai_agent,
-        messages=[{"role": "user", "content": question}]
-    )
+
+    # The two APIs are independent, so query them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        inception_future = executor.submit(
+            inception_client.run,
+            agent=inception_agent,
+            messages=[{"role": "user", "content": question}]
+        )
+        openai_future = executor.submit(
+            openai_client.run,
+            agent=openai_agent,
+            messages=[{"role": "user", "content": question}]
+        )
+        inception_response = inception_future.result()
+        openai_response = openai_future.result()
+
+    # Test with Inception Labs
+    print("🔵 Using Inception Labs with tools:")
+    print(f"Q: {question}")
+    print(f"A: {inception_response.messages[-1]['content']}\n")
+
+    # Test with OpenAI
+    print("🟢 Using OpenAI with tools:")
     print(f"Q: {question}")
     print(f"A: {openai_response.messages[-1]['content']}\n")
 
@@ -154,45 +160,57 @@ def compare_conversations():
         "What's my favorite color?"
     ]
 
-    # Test with Inception Labs
-    print("🔵 Using Inception Labs:")
+    def run_conversation(client, agent):
+        """Run all queries as one conversation, returning (query, reply) pairs."""
+        messages = []
+        transcript = []
+
+        for query in queries:
+            messages.append({"role": "user", "content": query})
+            # Bound the resent history to the most recent turns
+            response = client.run(agent=agent, messages=trim(messages))
+            messages.append({
+                "role": "assistant",
+                "content": response.messages[-1]['content']
+            })
+            transcript.append((query, response.messages[-1]['content']))
+
+        return transcript
+
     inception_agent = Agent(
         name="Inception Assistant",
         model="mercury",
         instructions="You are a helpful assistant that remembers context."
     )
-    inception_client = create_inception_swarm_client()
-    inception_messages = []
-
-    for query in queries:
-        inception_messages.append({"role": "user", "content": query})
-        response = inception_client.run(agent=inception_agent, messages=inception_messages)
-        inception_messages.append({
-            "role": "assistant",
-            "content": response.messages[-1]['content']
-        })
-        print(f"User: {query}")
-        print(f"Assistant: {response.messages[-1]['content']}\n")
-
-    # Test with OpenAI
-    print("🟢 Using OpenAI:")
     openai_agent = Agent(
         name="OpenAI Assistant",
         model="gpt-4",
         instructions="You are a helpful assistant that remembers context."
     )
-    openai_client = create_openai_swarm_client()
-    openai_messages = []
-
-    for query in queries:
-        openai_messages.append({"role": "user", "content": query})
-        response = openai_client.run(agent=openai_agent, messages=openai_messages)
-        openai_messages.append({
-            "role": "assistant",
-            "content": response.messages[-1]['content']
-        })
+
+    # Turns within a conversation depend on each other, but the two
+    # conversations do not, so run one per thread
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        inception_future = executor.submit(
+            run_conversation, create_inception_swarm_client(), inception_agent
+        )
+        openai_future = executor.submit(
+            run_conversation, create_openai_swarm_client(), openai_agent
+        )
+        inception_transcript = inception_future.result()
+        openai_transcript = openai_future.result()
+
+    # Test with Inception Labs
+    print("🔵 Using Inception Labs:")
+    for query, reply in inception_transcript:
+        print(f"User: {query}")
+        print(f"Assistant: {reply}\n")
+
+    # Test with OpenAI
+    print("🟢 Using OpenAI:")
+    for query, reply in openai_transcript:
         print(f"User: {query}")
-        print(f"Assistant: {response.messages[-1]['content']}\n")
+        print(f"Assistant: {reply}\n")
 
 
 # Example 4: Using both APIs in the same workflow
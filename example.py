@@ -1,60 +1,43 @@
+import operator
 import os
 from dotenv import load_dotenv
 from inception_agent import InceptionAgent
+from keyloader import load_api_keys
 
 # Load environment variables
 load_dotenv()
 
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
+def create_agent(inception_key: str, system_prompt: str) -> InceptionAgent:
+    """Create an agent for one example."""
+    return InceptionAgent(
+        inception_api_key=inception_key,
+        inception_base_url=os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1"),
+        model="mercury",
+        system_prompt=system_prompt
+    )
 
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    # Fall back to environment variables if not found in file
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
+
+# Arithmetic for the calculate tool; only the requested operation is evaluated
+_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": lambda a, b: a / b if b != 0 else "Error: Division by zero"
+}
 
 
 # Example 1: Simple chat without tools
-def simple_chat_example():
+def simple_chat_example(agent: InceptionAgent):
     print("=== Simple Chat Example ===\n")
 
-    inception_key, _ = load_api_keys()
-    agent = InceptionAgent(
-        inception_api_key=inception_key,
-        inception_base_url=os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1"),
-        model="mercury",
-        system_prompt="You are a helpful AI assistant."
-    )
-
     response = agent.chat("What is the capital of France?")
     print(f"User: What is the capital of France?")
     print(f"Agent: {response}\n")
 
 
 # Example 2: Agent with custom tools
-def agent_with_tools_example():
+def agent_with_tools_example(agent: InceptionAgent):
     print("=== Agent with Tools Example ===\n")
 
     # Define some example tool functions
@@ -69,26 +52,12 @@ def agent_with_tools_example():
 
     def calculate(operation: str, a: float, b: float) -> dict:
         """Perform mathematical operations."""
-        operations = {
-            "add": a + b,
-            "subtract": a - b,
-            "multiply": a * b,
-            "divide": a / b if b != 0 else "Error: Division by zero"
-        }
+        op = _OPS.get(operation)
         return {
             "operation": operation,
-            "result": operations.get(operation, "Unknown operation")
+            "result": op(a, b) if op else "Unknown operation"
         }
 
-    # Create agent
-    inception_key, _ = load_api_keys()
-    agent = InceptionAgent(
-        inception_api_key=inception_key,
-        inception_base_url=os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1"),
-        model="mercury",
-        system_prompt="You are a helpful assistant with access to weather and calculation tools."
-    )
-
     # Register tools
     agent.add_tool(
         name="get_weather",
@@ -145,17 +114,9 @@ def agent_with_tools_example():
 
 
 # Example 3: Multi-turn conversation
-def multi_turn_conversation_example():
+def multi_turn_conversation_example(agent: InceptionAgent):
     print("=== Multi-turn Conversation Example ===\n")
 
-    inception_key, _ = load_api_keys()
-    agent = InceptionAgent(
-        inception_api_key=inception_key,
-        inception_base_url=os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1"),
-        model="mercury",
-        system_prompt="You are a helpful assistant that remembers context."
-    )
-
     queries = [
         "My name is Alice.",
         "What's a good programming language for beginners?",
@@ -168,6 +129,35 @@ def multi_turn_conversation_example():
         print(f"Agent: {response}\n")
 
 
+def run(key_provider=load_api_keys):
+    """
+    Run all examples, loading the API key once.
+
+    key_provider returns (inception_key, openai_key); it defaults to the
+    .key file / environment loader. Each example gets its own agent, so
+    the tools registered by one never leak into another.
+    """
+    inception_key, _ = key_provider()
+
+    print("OpenAI Agent Platform with Inception Labs API\n")
+    print("=" * 50 + "\n")
+
+    # Run examples
+    simple_chat_example(create_agent(inception_key, "You are a helpful AI assistant."))
+    print("\n" + "=" * 50 + "\n")
+
+    agent_with_tools_example(create_agent(
+        inception_key,
+        "You are a helpful assistant with access to weather and calculation tools."
+    ))
+    print("\n" + "=" * 50 + "\n")
+
+    multi_turn_conversation_example(create_agent(
+        inception_key,
+        "You are a helpful assistant that remembers context."
+    ))
+
+
 if __name__ == "__main__":
     # Make sure you have either:
     # 1. A .key file with your Inception Labs API key, or
@@ -175,17 +165,7 @@ if __name__ == "__main__":
     # INCEPTION_BASE_URL=https://api.inceptionlabs.ai/v1 (optional)
 
     try:
-        print("OpenAI Agent Platform with Inception Labs API\n")
-        print("=" * 50 + "\n")
-
-        # Run examples
-        simple_chat_example()
-        print("\n" + "=" * 50 + "\n")
-
-        agent_with_tools_example()
-        print("\n" + "=" * 50 + "\n")
-
-        multi_turn_conversation_example()
+        run()
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,36 @@
+"""
+JSON helpers that use orjson when it is installed.
+
+orjson encodes and decodes several times faster than the standard library
+and produces bytes directly; without it these fall back to the json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def loads(data):
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, default=None) -> bytes:
+    """
+    Serialize obj to compact UTF-8 JSON bytes.
+
+    Non-string dict keys are converted to strings as json.dumps does. Values
+    orjson rejects, such as integers wider than 64 bits, are encoded with the
+    json module instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode()
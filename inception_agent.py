@@ -1,8 +1,20 @@
 import os
-import json
 import requests
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Any, Dict, Final, List, Optional
 from openai import OpenAI
+from urllib3.util.retry import Retry
+
+import fastjson
+from memory import compact_history, initial_messages
+
+if TYPE_CHECKING:
+    from memory import EmbeddingMemory
+
+# Default system prompt. Keeping it a constant keeps the first message of
+# every request byte-identical, so provider-side prompt caches can hit.
+SYSTEM_PROMPT: Final[str] = "You are a helpful assistant."
 
 
 class InceptionLabsModel:
@@ -16,6 +28,24 @@ class InceptionLabsModel:
             "Content-Type": "application/json"
         }
 
+        # Reuse pooled keep-alive connections across calls instead of paying
+        # a new TCP + TLS handshake per request, and retry rate limits and
+        # transient server errors with backoff
+        retry = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,
+            # Return the last response once retries run out, so
+            # raise_for_status() raises with the response body attached
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
     def create_completion(
         self,
         messages: List[Dict[str, str]],
@@ -23,10 +53,15 @@ class InceptionLabsModel:
         temperature: float = 0.7,
         max_tokens: int = 1000,
         tools: Optional[List[Dict]] = None,
+        tools_json: Optional[bytes] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Call Inception Labs API with OpenAI-compatible format.
+
+        tools_json is an already serialized tools list; it is spliced into
+        the request body as is, so a fixed tool schema is encoded only once
+        rather than on every call.
         """
         payload = {
             "model": model,
@@ -41,15 +76,20 @@ class InceptionLabsModel:
         # Add any additional kwargs
         payload.update(kwargs)
 
+        body = fastjson.dumps(payload)
+        if tools_json:
+            body = body[:-1] + b',"tools":' + tools_json + b'}'
+
         try:
-            response = requests.post(
+            # Content-Type is preset on the session
+            response = self.session.post(
                 f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=payload,
+                data=body,
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            # Decode the raw bytes directly, skipping requests' text decoding
+            return fastjson.loads(response.content)
         except requests.exceptions.RequestException as e:
             # Print the response body for debugging
             error_detail = ""
@@ -69,21 +109,98 @@ class InceptionAgent:
         inception_api_key: str,
         inception_base_url: str = "https://api.inceptionlabs.ai/v1",
         model: str = "mercury",
-        system_prompt: str = "You are a helpful assistant."
+        system_prompt: str = SYSTEM_PROMPT,
+        context: Optional[str] = None,
+        max_turns: int = 20,
+        memory: Optional["EmbeddingMemory"] = None
     ):
+        """
+        Args:
+            system_prompt: Static instructions sent first in every request
+            context: Optional dynamic context (user profile, retrieved
+                memory, ...) sent as a separate system message after the
+                system prompt, so it never changes the cached prefix
+            max_turns: Number of messages kept verbatim before older ones
+                are replaced by a model-generated summary; compaction keeps
+                the most recent max_turns // 2
+            memory: Optional semantic memory. When set, each request sends
+                only the system messages, the turns recalled as relevant to
+                the new message and the memory's most recent turns, instead
+                of the whole conversation history
+        """
         self.inception_model = InceptionLabsModel(inception_api_key, inception_base_url)
         self.model = model
         self.system_prompt = system_prompt
-        self.conversation_history: List[Dict[str, str]] = [
-            {"role": "system", "content": system_prompt}
-        ]
+        self.context = context
+        self.max_turns = max_turns
+        self.summary: Optional[str] = None
+        self.memory = memory
+        self.conversation_history: List[Dict[str, str]] = self._initial_messages()
         self.tools: List[Dict] = []
         self.tool_functions: Dict[str, callable] = {}
+        # Serialized self.tools, rebuilt only after a tool is added
+        self._tools_json: Optional[bytes] = None
+        # Runs the tool calls of a single turn concurrently
+        self.tool_executor = ThreadPoolExecutor(max_workers=8)
+
+    def _initial_messages(self) -> List[Dict[str, str]]:
+        """Return the system prompt message, followed by the context message if any."""
+        return initial_messages(self.system_prompt, self.context)
+
+    def _compact_history(self):
+        """Summarize older messages once the history outgrows max_turns."""
+        def summarize(messages: List[Dict[str, str]]) -> str:
+            response = self.inception_model.create_completion(
+                messages=messages,
+                model=self.model,
+                max_tokens=300
+            )
+            return response["choices"][0]["message"]["content"]
+
+        self.summary = compact_history(
+            self.conversation_history,
+            len(self._initial_messages()),
+            self.summary,
+            self.max_turns,
+            summarize
+        )
+
+    def _request_messages(self, turn_start: int, recalled: List[str]) -> List[Dict]:
+        """
+        Build the messages sent for the current turn when memory is enabled.
+
+        Returns the system messages, the recalled turns, the last
+        memory.recent_turns turns verbatim and the current turn's messages
+        (user message plus any tool calls and results so far).
+        """
+        history = self.conversation_history
+        prefix = len(self._initial_messages())
+
+        window_start = turn_start
+        for _ in range(self.memory.recent_turns):
+            window_start -= 1
+            while window_start > prefix and history[window_start]["role"] != "user":
+                window_start -= 1
+            if window_start <= prefix:
+                window_start = prefix
+                break
+
+        messages = history[:prefix]
+        if recalled:
+            messages.append({
+                "role": "system",
+                "content": "Relevant earlier conversation:\n\n" + "\n\n".join(recalled)
+            })
+        return messages + history[window_start:]
 
     def add_tool(self, name: str, description: str, parameters: Dict, function: callable):
         """
         Register a tool/function that the agent can use.
 
+        Register all tools before the first chat() call: the tools list is
+        part of the cached request prefix on many providers, so changing it
+        mid-conversation invalidates that cache.
+
         Args:
             name: Function name
             description: What the function does
@@ -100,18 +217,28 @@ class InceptionAgent:
         }
         self.tools.append(tool_definition)
         self.tool_functions[name] = function
+        self._tools_json = None
+
+    def _serialized_tools(self) -> Optional[bytes]:
+        """Return the tools list as JSON bytes, serializing it only once."""
+        if not self.tools:
+            return None
+        if self._tools_json is None:
+            self._tools_json = fastjson.dumps(self.tools)
+        return self._tools_json
 
     def execute_tool_call(self, tool_call: Dict) -> str:
         """Execute a tool/function call."""
         function_name = tool_call["function"]["name"]
-        function_args = json.loads(tool_call["function"]["arguments"])
 
         if function_name not in self.tool_functions:
             return f"Error: Function {function_name} not found"
 
         try:
+            function_args = fastjson.loads(tool_call["function"]["arguments"])
             result = self.tool_functions[function_name](**function_args)
-            return json.dumps(result)
+            # Message content must be text, so decode the serialized bytes
+            return fastjson.dumps(result).decode()
         except Exception as e:
             return f"Error executing {function_name}: {str(e)}"
 
@@ -120,21 +247,36 @@ class InceptionAgent:
         Send a message to the agent and get a response.
         Handles tool calls automatically.
         """
+        turn_start = len(self.conversation_history)
+
         # Add user message to history
         self.conversation_history.append({
             "role": "user",
             "content": user_message
         })
 
+        if self.memory:
+            # Only recalled and recent turns are sent, so the stored history
+            # is never resent in full and needs no compaction
+            recalled = self.memory.search(user_message)
+        else:
+            # Keep the resent history bounded
+            self._compact_history()
+
         iteration = 0
         while iteration < max_iterations:
             iteration += 1
 
             # Call Inception Labs API
+            if self.memory:
+                messages = self._request_messages(turn_start, recalled)
+            else:
+                messages = self.conversation_history
+
             response = self.inception_model.create_completion(
-                messages=self.conversation_history,
+                messages=messages,
                 model=self.model,
-                tools=self.tools if self.tools else None
+                tools_json=self._serialized_tools()
             )
 
             # Extract assistant message
@@ -145,27 +287,37 @@ class InceptionAgent:
 
             # Check if there are tool calls
             if assistant_message.get("tool_calls"):
-                # Execute each tool call
-                for tool_call in assistant_message["tool_calls"]:
-                    tool_result = self.execute_tool_call(tool_call)
+                tool_calls = assistant_message["tool_calls"]
+
+                # Tool calls in one turn are independent, so execute them
+                # concurrently; map() keeps results in call order
+                if len(tool_calls) == 1:
+                    tool_results = [self.execute_tool_call(tool_calls[0])]
+                else:
+                    tool_results = self.tool_executor.map(self.execute_tool_call, tool_calls)
 
-                    # Add tool result to history
-                    self.conversation_history.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call["id"],
-                        "content": tool_result
-                    })
+                # Add tool results to history in one extend. They stay plain
+                # dicts because the history is serialized as is.
+                self.conversation_history.extend(
+                    {"role": "tool", "tool_call_id": tool_call["id"], "content": tool_result}
+                    for tool_call, tool_result in zip(tool_calls, tool_results)
+                )
 
                 # Continue loop to get final response after tool execution
                 continue
 
-            # No tool calls, return the response
+            # No tool calls, remember the turn and return the response
+            if self.memory:
+                self.memory.add(f"user: {user_message}\nassistant: {assistant_message['content']}")
             return assistant_message["content"]
 
         return "Max iterations reached without final response"
 
     def reset_conversation(self):
-        """Clear conversation history except system prompt."""
-        self.conversation_history = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        """Clear conversation history except system prompt and context."""
+        self.summary = None
+        if self.memory:
+            self.memory.clear()
+        # Truncate in place: keeps the same list and the same system message
+        # objects, so anything holding a reference sees the reset
+        del self.conversation_history[len(self._initial_messages()):]
@@ -6,66 +6,118 @@ User types questions in the terminal, and the agent responds using:
 - OpenAI guardrails for safety and content moderation
 """
 
-import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Final, Optional
 from dotenv import load_dotenv
+from keyloader import load_api_keys
+from memory import compact_history, initial_messages
 from openai import OpenAI
 
 load_dotenv()
 
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
+# Kept constant so every request starts with byte-identical system tokens,
+# letting provider-side prompt caches hit
+SYSTEM_PROMPT: Final[str] = "You are a helpful, friendly assistant. Be concise but informative."
 
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
+# New output characters between incremental moderation checks while streaming
+STREAM_CHECK_CHARS = 200
 
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
+# Maximum number of moderation verdicts remembered per agent
+MODERATION_CACHE_SIZE = 4096
 
 
 class ChatAgent:
     """Interactive chat agent with guardrails."""
 
-    def __init__(self, mercury_client: OpenAI, openai_client: OpenAI):
+    def __init__(
+        self,
+        mercury_client: OpenAI,
+        openai_client: OpenAI,
+        context: Optional[str] = None,
+        max_turns: int = 20
+    ):
         self.mercury_client = mercury_client
         self.openai_client = openai_client
-        self.messages = [
-            {"role": "system", "content": "You are a helpful, friendly assistant. Be concise but informative."}
-        ]
+        # Once more than max_turns messages accumulate, all but the newest
+        # max_turns // 2 are condensed into summary
+        self.max_turns = max_turns
+        self.summary: Optional[str] = None
+        # Dynamic context goes in its own message after the system prompt so
+        # it never perturbs the cached prefix
+        self.context = context
+        self.messages = self._initial_messages()
+        # Background moderation of partial output while a reply streams
+        self.moderation_executor = ThreadPoolExecutor(max_workers=2)
+        # LRU of moderation verdicts keyed by a hash of the text, so repeated
+        # inputs ("hi", "help", canned prompts) skip the API round-trip. The
+        # lock guards it against the background streaming checks.
+        self._moderation_cache: OrderedDict[str, tuple[str, ...]] = OrderedDict()
+        self._moderation_lock = threading.Lock()
+
+    def _initial_messages(self) -> list[dict]:
+        """Return the system prompt message, followed by the context message if any."""
+        return initial_messages(SYSTEM_PROMPT, self.context)
+
+    def _compact_history(self):
+        """Summarize older messages once the history outgrows max_turns."""
+        def summarize(messages: list[dict]) -> str:
+            print("🟢 → Calling Inception Labs API (summarizing earlier conversation)...")
+            response = self.mercury_client.chat.completions.create(
+                model="mercury",
+                messages=messages,
+                max_tokens=300
+            )
+            return response.choices[0].message.content
+
+        # The system prompt stays first, preserving the cached prefix
+        self.summary = compact_history(
+            self.messages,
+            len(self._initial_messages()),
+            self.summary,
+            self.max_turns,
+            summarize
+        )
+
+    def _moderate(self, text: str) -> tuple[str, ...]:
+        """Moderate text and return its flagged categories (empty if safe)."""
+        key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+        with self._moderation_lock:
+            flagged_categories = self._moderation_cache.get(key)
+            if flagged_categories is not None:
+                self._moderation_cache.move_to_end(key)
+                return flagged_categories
+
+        moderation_response = self.openai_client.moderations.create(
+            input=text,
+            model="omni-moderation-latest"
+        )
+
+        result = moderation_response.results[0]
+
+        flagged_categories = tuple(
+            category for category, flagged in vars(result.categories).items()
+            if flagged is True
+        ) if result.flagged else ()
+
+        with self._moderation_lock:
+            self._moderation_cache[key] = flagged_categories
+            if len(self._moderation_cache) > MODERATION_CACHE_SIZE:
+                self._moderation_cache.popitem(last=False)
+
+        return flagged_categories
 
     def check_input_safety(self, user_input: str) -> tuple[bool, str]:
         """Check if user input is safe using OpenAI moderation."""
         try:
             print("🔵 → Calling OpenAI API (input guardrail - moderation check)...")
-            moderation_response = self.openai_client.moderations.create(
-                input=user_input,
-                model="omni-moderation-latest"
-            )
-
-            result = moderation_response.results[0]
+            flagged_categories = self._moderate(user_input)
 
-            if result.flagged:
-                flagged_categories = [
-                    category for category, flagged in result.categories.model_dump().items()
-                    if flagged
-                ]
+            if flagged_categories:
                 print("🔵 ← OpenAI response: Input flagged as unsafe")
                 return False, f"Content policy violation: {', '.join(flagged_categories)}"
 
@@ -81,18 +133,9 @@ class ChatAgent:
         """Check if agent output is safe using OpenAI moderation."""
         try:
             print("🔵 → Calling OpenAI API (output guardrail - moderation check)...")
-            moderation_response = self.openai_client.moderations.create(
-                input=output,
-                model="omni-moderation-latest"
-            )
-
-            result = moderation_response.results[0]
+            flagged_categories = self._moderate(output)
 
-            if result.flagged:
-                flagged_categories = [
-                    category for category, flagged in result.categories.model_dump().items()
-                    if flagged
-                ]
+            if flagged_categories:
                 print("🔵 ← OpenAI response: Output flagged as unsafe")
                 return False, f"Response blocked due to: {', '.join(flagged_categories)}"
 
@@ -103,8 +146,72 @@ class ChatAgent:
             print(f"⚠️ Warning: Output guardrail error: {e}")
             return True, ""
 
-    def chat(self, user_input: str) -> str:
-        """Process user input and return agent response."""
+    def _stream_reply(self, response, on_token: Callable[[str], None]) -> tuple[str, tuple[str, ...]]:
+        """
+        Consume a streamed completion, passing only moderated text to on_token.
+
+        The text so far is moderated in the background every
+        STREAM_CHECK_CHARS characters, and a prefix is shown only once its
+        check has cleared; the rest is shown after the complete reply is
+        checked. Unmoderated text therefore never reaches the screen.
+        Returns the reply and its flagged categories (empty if safe).
+        """
+        # Collect pieces in a list and join once, rather than repeatedly
+        # concatenating strings
+        parts = []
+        length = checked_length = shown = 0
+        # (checked prefix, moderation future), oldest first
+        checks = []
+
+        for chunk in response:
+            if not chunk.choices or chunk.choices[0].delta.content is None:
+                continue
+            parts.append(chunk.choices[0].delta.content)
+            length += len(chunk.choices[0].delta.content)
+
+            # Moderate the text so far in the background, so the check
+            # overlaps generation instead of following it
+            if length - checked_length >= STREAM_CHECK_CHARS:
+                checked_length = length
+                # A newer prefix supersedes checks not yet started
+                checks = [(prefix, check) for prefix, check in checks if not check.cancel()]
+                prefix = "".join(parts)
+                checks.append((prefix, self.moderation_executor.submit(self._moderate, prefix)))
+
+            while checks and checks[0][1].done():
+                prefix, check = checks.pop(0)
+                if check.exception():
+                    continue
+                if check.result():
+                    # Stop generating as soon as partial output is flagged
+                    response.close()
+                    return prefix, check.result()
+                if len(prefix) > shown:
+                    on_token(prefix[shown:])
+                    shown = len(prefix)
+
+        output = "".join(parts)
+
+        # Final check of the complete reply before showing the remainder
+        try:
+            flagged_categories = self._moderate(output)
+        except Exception as e:
+            print(f"⚠️ Warning: Output guardrail error: {e}")
+            flagged_categories = ()
+
+        if not flagged_categories and len(output) > shown:
+            on_token(output[shown:])
+        return output, flagged_categories
+
+    def chat(self, user_input: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Process user input and return agent response.
+
+        If on_token is given, the response is streamed and on_token is
+        called with text as soon as it has passed output moderation, so
+        callers can show it before generation finishes without ever
+        showing unchecked text.
+        """
         # Input guardrail
         is_safe, error_msg = self.check_input_safety(user_input)
         if not is_safe:
@@ -114,22 +221,35 @@ class ChatAgent:
         self.messages.append({"role": "user", "content": user_input})
 
         try:
+            # Keep the resent history bounded
+            self._compact_history()
+
             # Get response from Mercury
             print("🟢 → Calling Inception Labs API (Mercury model for chat completion)...")
             response = self.mercury_client.chat.completions.create(
                 model="mercury",
                 messages=self.messages,
                 max_tokens=500,
-                temperature=0.7
+                temperature=0.7,
+                stream=on_token is not None
             )
 
-            output = response.choices[0].message.content
-            print("🟢 ← Inception Labs response received")
-
-            # Output guardrail
-            is_safe, error_msg = self.check_output_safety(output)
-            if not is_safe:
-                return f"❌ Response was blocked by safety guardrails. {error_msg}"
+            if on_token is None:
+                output = response.choices[0].message.content
+                print("🟢 ← Inception Labs response received")
+
+                # Output guardrail
+                is_safe, error_msg = self.check_output_safety(output)
+                if not is_safe:
+                    return f"❌ Response was blocked by safety guardrails. {error_msg}"
+            else:
+                # Output guardrail, applied while streaming
+                output, flagged_categories = self._stream_reply(response, on_token)
+                print()
+                if flagged_categories:
+                    print("🔵 ← OpenAI response: Output flagged as unsafe")
+                    return f"❌ Response was blocked by safety guardrails. Response blocked due to: {', '.join(flagged_categories)}"
+                print("🟢 ← Inception Labs response received (output moderated while streaming)")
 
             # Add assistant message to conversation
             self.messages.append({"role": "assistant", "content": output})
@@ -141,9 +261,9 @@ class ChatAgent:
 
     def reset_conversation(self):
         """Clear conversation history."""
-        self.messages = [
-            {"role": "system", "content": "You are a helpful, friendly assistant. Be concise but informative."}
-        ]
+        self.summary = None
+        # Truncate in place, keeping the system message objects
+        del self.messages[len(self._initial_messages()):]
         print("🔄 Conversation history cleared.")
 
 
@@ -212,11 +332,22 @@ def main():
                 print_welcome()
                 continue
 
-            # Get response from agent
-            response = agent.chat(user_input)
+            # Get response from agent, printing it as it streams in
+            streamed = []
+
+            def print_token(token):
+                if not streamed:
+                    print("\n🤖 Agent: ", end="", flush=True)
+                streamed.append(token)
+                print(token, end="", flush=True)
 
-            # Print response
-            print(f"\n🤖 Agent: {response}\n")
+            response = agent.chat(user_input, on_token=print_token)
+
+            # Print response, unless it was already streamed
+            if streamed and response == "".join(streamed):
+                print()
+            else:
+                print(f"\n🤖 Agent: {response}\n")
 
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
@@ -0,0 +1,128 @@
+"""
+Shared API key loader for the examples.
+
+Keys are read from a .key file in which each key sits on the line after
+its header:
+
+    #Inseption labs API key
+    <inception key>
+    #OpenAI API key
+    <openai key>
+
+Missing keys fall back to the INCEPTION_API_KEY and OPENAI_API_KEY
+environment variables.
+
+Several Inception Labs keys, for spreading load across rate limits, can be
+listed one per line under a "#Inseption labs API keys" header (or in the
+comma-separated INCEPTION_API_KEYS variable); see load_inception_key_pool().
+
+load_env() is a minimal .env reader for scripts that want to avoid
+importing python-dotenv.
+"""
+
+import os
+from functools import lru_cache
+
+_INCEPTION_POOL_HEADER = '#Inseption labs API keys'
+
+# Header line -> which key follows it. The "Inseption" spelling is the
+# established .key format; the correct spelling is accepted too. The first
+# key of a pool also serves as the single Inception key. When several headers
+# give the same key, the first one in the file wins.
+HEADERS = {
+    '#Inseption labs API key': 'inception',
+    '#Inception labs API key': 'inception',
+    _INCEPTION_POOL_HEADER: 'inception',
+    '#OpenAI API key': 'openai',
+}
+
+
+@lru_cache(maxsize=1)
+def load_api_keys():
+    """Load API keys from .key file or environment variables."""
+    keys = {}
+
+    try:
+        with open('.key', 'r') as f:
+            # Single lazy pass over the file: a header's key is the next line,
+            # and reading stops as soon as both keys are found
+            for line in f:
+                name = HEADERS.get(line.strip())
+                if name:
+                    # Always consume the key line, even for a repeated header
+                    keys.setdefault(name, next(f, '').strip())
+                    if len(keys) == 2:
+                        break
+    except FileNotFoundError:
+        pass
+
+    inception_key = keys.get('inception')
+    openai_key = keys.get('openai')
+
+    # Fall back to environment variables if not found in file
+    if not inception_key:
+        inception_key = os.getenv("INCEPTION_API_KEY")
+    if not openai_key:
+        openai_key = os.getenv("OPENAI_API_KEY")
+
+    return inception_key, openai_key
+
+
+@lru_cache(maxsize=1)
+def load_inception_key_pool():
+    """
+    Load every configured Inception Labs API key as a tuple.
+
+    Reads the keys listed under the pool header up to the next blank or
+    comment line, then INCEPTION_API_KEYS, and finally falls back to the
+    single key from load_api_keys().
+    """
+    keys = []
+
+    try:
+        with open('.key', 'r') as f:
+            for line in f:
+                if line.strip() != _INCEPTION_POOL_HEADER:
+                    continue
+                for key_line in f:
+                    key = key_line.strip()
+                    if not key or key.startswith('#'):
+                        break
+                    keys.append(key)
+                break
+    except FileNotFoundError:
+        pass
+
+    if not keys:
+        keys = [key.strip() for key in os.getenv("INCEPTION_API_KEYS", "").split(",") if key.strip()]
+    if not keys:
+        inception_key, _ = load_api_keys()
+        keys = [inception_key] if inception_key else []
+
+    return tuple(keys)
+
+
+def load_env(path: str = '.env'):
+    """
+    Load KEY=VALUE lines from a .env file into os.environ.
+
+    Blank lines, comments and an optional "export " prefix are handled, and
+    surrounding quotes are stripped. Variables already set are not
+    overridden, matching python-dotenv's default.
+    """
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                if line.startswith('export '):
+                    line = line[len('export '):]
+
+                name, value = line.split('=', 1)
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                    value = value[1:-1]
+                os.environ.setdefault(name.strip(), value)
+    except FileNotFoundError:
+        pass
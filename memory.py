@@ -0,0 +1,373 @@
+"""
+Conversation memory helpers shared by the examples.
+
+trim() keeps a chat transcript within a token budget so that each request
+resends a bounded prompt instead of the whole, ever-growing history.
+EmbeddingMemory recalls only the earlier turns relevant to a new message,
+and SemanticCache reuses answers to repeated or paraphrased questions.
+"""
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed by EmbeddingMemory and SemanticCache
+    np = None
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a ~4 characters/token estimate
+    tiktoken = None
+
+# Approximate per-message overhead of the chat format (role, separators)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Instructions for condensing older turns once the history grows too long
+SUMMARY_PROMPT = (
+    "Summarize the conversation below, including any earlier summary, in a few "
+    "sentences. Keep names, facts, preferences and decisions the assistant will "
+    "need later."
+)
+
+
+@lru_cache(maxsize=1)
+def _faiss():
+    """
+    Import faiss on first use, or return None if it is not installed.
+
+    faiss and sentence-transformers are imported lazily so that importing
+    this module for trim() or compact_history() stays cheap.
+    """
+    try:
+        import faiss
+    except ImportError:  # Optional: vector search falls back to numpy
+        return None
+    return faiss
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.encoding_for_model("gpt-4")
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in text, exactly with tiktoken or estimated without it."""
+    if tiktoken is None:
+        return len(text) // 4
+    return len(_encoding().encode(text))
+
+
+def trim(messages: List[Dict], max_tokens: int = 4096) -> List[Dict]:
+    """
+    Drop the oldest non-system turns until messages fit in max_tokens.
+
+    Leading system messages and the newest message are always kept. The
+    list is trimmed in place, so a conversation's messages behave like a
+    ring buffer of its most recent turns, and is also returned.
+    """
+    start = 0
+    while start < len(messages) and messages[start].get("role") == "system":
+        start += 1
+
+    budget = max_tokens - sum(
+        count_tokens(str(message.get("content") or "")) + _MESSAGE_OVERHEAD_TOKENS
+        for message in messages[:start]
+    )
+
+    # Walk back from the newest message until the budget is spent
+    cut = len(messages)
+    while cut > start:
+        cost = count_tokens(str(messages[cut - 1].get("content") or "")) + _MESSAGE_OVERHEAD_TOKENS
+        if budget - cost < 0 and cut < len(messages):
+            break
+        budget -= cost
+        cut -= 1
+
+    # Never start the kept history with tool results orphaned from their call
+    while cut < len(messages) - 1 and messages[cut].get("role") == "tool":
+        cut += 1
+
+    del messages[start:cut]
+    return messages
+
+
+def initial_messages(system_prompt: str, context: Optional[str] = None) -> List[Dict]:
+    """Return the system prompt message, followed by the context message if any."""
+    messages = [{"role": "system", "content": system_prompt}]
+    if context:
+        messages.append({"role": "system", "content": context})
+    return messages
+
+
+def compact_history(
+    messages: List[Dict],
+    prefix: int,
+    summary: Optional[str],
+    max_turns: int,
+    summarize: Callable[[List[Dict]], str]
+) -> Optional[str]:
+    """
+    Summarize older messages once more than max_turns follow the prefix.
+
+    The first prefix messages (system prompt and context) stay untouched so
+    the cached prompt prefix is preserved; everything after them except the
+    last max_turns // 2 messages is replaced, in place, by one summary
+    message. Cutting to half the limit means the summarizer runs again only
+    after several more turns rather than on every turn. The kept window
+    always starts at a user message so tool calls are never separated from
+    their results.
+
+    summarize is called with the summarization request messages and returns
+    the summary text. Returns the new summary, or summary unchanged if
+    nothing was compacted.
+    """
+    start = prefix + (1 if summary else 0)
+    if len(messages) - start <= max_turns:
+        return summary
+
+    cut = len(messages) - max_turns // 2
+    while cut < len(messages) and messages[cut]["role"] != "user":
+        cut += 1
+    if cut >= len(messages):
+        return summary
+
+    transcript = "\n".join(
+        f"{message['role']}: {message['content']}"
+        for message in messages[start:cut]
+        if message.get("content")
+    )
+    if summary:
+        transcript = f"Earlier summary: {summary}\n{transcript}"
+
+    summary = summarize([
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": transcript}
+    ])
+    messages[prefix:cut] = [{
+        "role": "system",
+        "content": f"Summary of earlier conversation: {summary}"
+    }]
+    return summary
+
+
+class _Embedder:
+    """Unit-normalized text embeddings, cached by SHA1 of the text."""
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+        self._cache: Dict[str, "np.ndarray"] = {}
+
+    def __call__(self, text: str) -> "np.ndarray":
+        key = hashlib.sha1(text.encode()).hexdigest()
+        vector = self._cache.get(key)
+        if vector is None:
+            response = self.client.embeddings.create(model=self.model, input=text)
+            vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            self._cache[key] = vector
+        return vector
+
+
+class _LocalEmbedder:
+    """Local sentence-transformers embeddings, unit-normalized and cached by SHA1 of the text."""
+
+    def __init__(self, model: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model)
+        self._cache: Dict[str, "np.ndarray"] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str) -> "np.ndarray":
+        key = hashlib.sha1(text.encode()).hexdigest()
+        vector = self._cache.get(key)
+        if vector is None:
+            # The model is not safe to call from several threads at once
+            with self._lock:
+                vector = self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+            self._cache[key] = vector
+        return vector
+
+
+class EmbeddingMemory:
+    """
+    Semantic recall over past conversation turns.
+
+    Each completed turn is embedded once and kept in a vector index. On a
+    new turn only the top_k most similar earlier turns are recalled, so the
+    prompt carries O(top_k) old turns instead of the full transcript.
+    Vectors are stored in a numpy array and searched by cosine similarity,
+    or in a faiss inner-product index when faiss is installed.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str = "text-embedding-3-small",
+        top_k: int = 3,
+        recent_turns: int = 2
+    ):
+        """
+        Args:
+            client: OpenAI client used for embeddings
+            model: Embedding model name
+            top_k: Number of earlier turns recalled per query
+            recent_turns: Number of latest turns the caller sends verbatim;
+                these are skipped by search() so they are not sent twice
+        """
+        if np is None:
+            raise ImportError("EmbeddingMemory requires numpy (pip install numpy)")
+
+        self.top_k = top_k
+        self.recent_turns = recent_turns
+        self.turns: List[str] = []
+        self._vectors = None
+        self._index = None
+        self._faiss = _faiss()
+        # Identical text is never embedded twice
+        self._embed = _Embedder(client, model)
+
+    def add(self, text: str):
+        """Embed a completed turn and add it to the index."""
+        vector = self._embed(text)
+        self.turns.append(text)
+
+        if self._faiss is not None:
+            if self._index is None:
+                self._index = self._faiss.IndexFlatIP(len(vector))
+            self._index.add(vector.reshape(1, -1))
+        elif self._vectors is None:
+            self._vectors = vector.reshape(1, -1)
+        else:
+            self._vectors = np.vstack([self._vectors, vector])
+
+    def search(self, query: str) -> List[str]:
+        """Return up to top_k earlier turns most similar to query, oldest first."""
+        limit = len(self.turns) - self.recent_turns
+        if limit <= 0 or self.top_k <= 0:
+            return []
+
+        query_vector = self._embed(query)
+
+        if self._faiss is not None:
+            # Over-fetch so the recent turns can be filtered out afterwards
+            k = min(self.top_k + self.recent_turns, len(self.turns))
+            _, ids = self._index.search(query_vector.reshape(1, -1), k)
+            hits = [i for i in ids[0] if 0 <= i < limit][:self.top_k]
+        else:
+            scores = self._vectors[:limit] @ query_vector
+            hits = np.argsort(scores)[::-1][:self.top_k]
+
+        return [self.turns[i] for i in sorted(hits)]
+
+    def clear(self):
+        """Forget all stored turns; cached embeddings are kept."""
+        self.turns = []
+        self._vectors = None
+        self._index = None
+
+
+class SemanticCache:
+    """
+    Answer cache matched by meaning rather than exact text.
+
+    A conversation is looked up by a blend of its last message's embedding
+    and the decayed embeddings of the earlier turns, so a paraphrased
+    question in the same context hits while the same words after a
+    different conversation do not. Entries are grouped by scope (e.g. agent
+    name and model) so answers never cross agents.
+
+    Embeddings are computed locally with sentence-transformers, so a lookup
+    costs no network round-trip and prompts stay on this machine. Similar
+    wording is not the same question when a detail such as a city or a
+    number decides the answer, so do not put this in front of tool-calling
+    agents.
+    """
+
+    def __init__(
+        self,
+        model: str = "all-MiniLM-L6-v2",
+        threshold: float = 0.95,
+        alpha: float = 0.7,
+        decay: float = 0.5
+    ):
+        """
+        Args:
+            model: sentence-transformers model name
+            threshold: Minimum cosine similarity for a hit
+            alpha: Weight of the last message versus the earlier turns
+            decay: Per-turn weight falloff of earlier turns, newest first
+        """
+        if np is None:
+            raise ImportError("SemanticCache requires numpy (pip install numpy)")
+        try:
+            self._embed = _LocalEmbedder(model)
+        except ImportError as e:
+            raise ImportError("SemanticCache requires sentence-transformers (pip install sentence-transformers)") from e
+
+        self.threshold = threshold
+        self.alpha = alpha
+        self.decay = decay
+        self._faiss = _faiss()
+        # scope -> (vector store, cached answers)
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _lookup_vector(self, messages: List[Dict]) -> "np.ndarray":
+        """Blend the last message with the earlier turns into one unit vector."""
+        contents = [message["content"] for message in messages if message.get("content")]
+        vector = self._embed(contents[-1])
+
+        if len(contents) > 1:
+            context = sum(
+                self.decay ** i * self._embed(content)
+                for i, content in enumerate(reversed(contents[:-1]))
+            )
+            context /= np.linalg.norm(context) or 1.0
+            vector = self.alpha * vector + (1 - self.alpha) * context
+            vector /= np.linalg.norm(vector) or 1.0
+
+        return vector
+
+    def get(self, scope: str, messages: List[Dict]) -> Optional[str]:
+        """Return the cached answer for a similar conversation, or None."""
+        vector = self._lookup_vector(messages)
+
+        with self._lock:
+            if scope not in self._entries:
+                return None
+            store, answers = self._entries[scope]
+
+            if self._faiss is not None:
+                scores, ids = store.search(vector.reshape(1, -1), 1)
+                score, best = scores[0][0], ids[0][0]
+            else:
+                similarities = store @ vector
+                best = int(np.argmax(similarities))
+                score = similarities[best]
+
+        return answers[best] if score >= self.threshold else None
+
+    def put(self, scope: str, messages: List[Dict], answer: str):
+        """Cache answer for the conversation in messages."""
+        vector = self._lookup_vector(messages)
+
+        with self._lock:
+            if scope not in self._entries:
+                if self._faiss is not None:
+                    store = self._faiss.IndexFlatIP(len(vector))
+                else:
+                    store = np.empty((0, len(vector)), dtype=np.float32)
+                self._entries[scope] = (store, [])
+            store, answers = self._entries[scope]
+
+            if self._faiss is not None:
+                store.add(vector.reshape(1, -1))
+            else:
+                store = np.vstack([store, vector])
+                self._entries[scope] = (store, answers)
+            answers.append(answer)
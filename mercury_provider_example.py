@@ -5,41 +5,16 @@ This demonstrates using the openai-agents SDK with a custom ModelProvider
 that points to Inception Labs Mercury model instead of OpenAI.
 """
 
-import os
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from keyloader import load_api_keys
 from agents import Agent, ModelSettings, ModelProvider
 
 load_dotenv()
 
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
-
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
-
-
 # Define a custom provider for Inception Labs Mercury
 class InceptionMercuryProvider(ModelProvider):
     """Custom ModelProvider for Inception Labs Mercury API."""
@@ -113,8 +88,45 @@ def coding_assistant_example():
     print()
 
 
+def batched_variants(provider: InceptionMercuryProvider, models, prompt: str) -> dict:
+    """
+    Get one answer per variant label from a single request.
+
+    A single model is asked for all labeled answers at once, trading
+    per-variant fidelity (every answer comes from the same model) for one
+    round-trip instead of one per variant. Returns {label: answer}.
+    """
+    labels = [model_name for model_name, _ in models]
+    agent = Agent(
+        name="batched-variants-agent",
+        instructions="You are a concise technical assistant.",
+        model=provider.default_model(),
+        provider=provider,
+        model_settings=ModelSettings(temperature=0.5, max_tokens=200 * len(labels))
+    )
+
+    user_content = (
+        f"Produce {len(labels)} answers labeled "
+        + ", ".join(f"[{label}]" for label in labels)
+        + ", each on its own line starting with its label, to: "
+        + prompt
+    )
+    response = str(agent.run(user_content))
+
+    # Split on the labels; text after each label up to the next one is its answer
+    pattern = r"\[(" + "|".join(re.escape(label) for label in labels) + r")\]"
+    parts = re.split(pattern, response)
+    return {label: answer.strip() for label, answer in zip(parts[1::2], parts[2::2])}
+
+
 # Example 3: Different Model Variants
-def model_variants_example():
+def model_variants_example(batched: bool = False):
+    """
+    Compare answers from each Mercury variant.
+
+    With batched=True one request produces all labeled answers instead of
+    one request per model (see batched_variants).
+    """
     print("=== Example 3: Testing Different Mercury Model Variants ===\n")
 
     inception_key, _ = load_api_keys()
@@ -127,9 +139,21 @@ def model_variants_example():
 
     prompt = "Explain what a REST API is in one sentence."
 
-    for model_name, description in models:
-        print(f"🔷 {model_name} ({description}):")
+    if batched:
+        try:
+            answers = batched_variants(InceptionMercuryProvider(api_key=inception_key), models, prompt)
+        except Exception as e:
+            print(f"Error: {e}\n")
+            return
+
+        for model_name, description in models:
+            print(f"🔷 {model_name} ({description}, batched):")
+            print(f"Response: {answers.get(model_name, '(missing from batched response)')}")
+            print()
+        return
 
+    def run_one(model):
+        model_name, description = model
         provider = InceptionMercuryProvider(api_key=inception_key)
         agent = Agent(
             name=f"{model_name}-agent",
@@ -140,11 +164,18 @@ def model_variants_example():
         )
 
         try:
-            response = agent.run(prompt)
-            print(f"Response: {response}")
+            return f"Response: {agent.run(prompt)}"
         except Exception as e:
-            print(f"Error: {e}")
+            return f"Error: {e}"
 
+    # The variants are independent, so query them concurrently; map()
+    # returns results in model order
+    with ThreadPoolExecutor(max_workers=len(models)) as executor:
+        results = list(executor.map(run_one, models))
+
+    for (model_name, description), result in zip(models, results):
+        print(f"🔷 {model_name} ({description}):")
+        print(result)
         print()
 
 
@@ -159,9 +190,7 @@ def temperature_control_example():
 
     temperatures = [0.2, 0.7, 1.2]
 
-    for temp in temperatures:
-        print(f"🌡️ Temperature: {temp}")
-
+    def run_one(temp):
         agent = Agent(
             name="MercuryCreativeAgent",
             instructions="You are a creative writing assistant.",
@@ -169,8 +198,13 @@ def temperature_control_example():
             provider=provider,
             model_settings=ModelSettings(temperature=temp, max_tokens=100)
         )
+        return agent.run(prompt)
+
+    with ThreadPoolExecutor(max_workers=len(temperatures)) as executor:
+        responses = list(executor.map(run_one, temperatures))
 
-        response = agent.run(prompt)
+    for temp, response in zip(temperatures, responses):
+        print(f"🌡️ Temperature: {temp}")
         print(f"{response}")
         print()
 
@@ -2,48 +2,116 @@
 OpenAI Quickstart Pattern adapted for Inception Labs Mercury Model
 
 This demonstrates common OpenAI SDK patterns but using Inception Labs API instead.
+
+The OpenAI SDK is imported on first use (see get_client) so importing this
+module, or running a single example, stays cheap.
 """
 
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+import hashlib
+import sys
+from collections import OrderedDict
+from functools import cache
+from typing import TYPE_CHECKING
 
-load_dotenv()
+import fastjson
+from keyloader import load_api_keys, load_env
 
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
+try:
+    import diskcache
+except ImportError:  # Optional: cache responses in memory for this run only
+    diskcache = None
+
+load_env()
+
+
+@cache
+def get_client() -> "OpenAI":
+    """Return the shared Inception Labs client, creating it on first use."""
+    from openai import OpenAI
+
+    inception_api_key, _ = load_api_keys()
+    return OpenAI(
+        api_key=inception_api_key,
+        base_url="https://api.inceptionlabs.ai/v1"
+    )
+
+
+# Requests above this temperature are sampled, so their responses are not reused
+CACHE_MAX_TEMPERATURE = 0.3
+
+# Persisted across runs when diskcache is installed
+_response_cache = diskcache.Cache(".llm_cache", size_limit=1 << 30) if diskcache else OrderedDict()
+_MEMORY_CACHE_SIZE = 256
+
+
+def _jsonable(obj):
+    """Convert SDK objects (e.g. a returned message) in messages to plain data."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True)
+    return str(obj)
+
+
+def cached_completion(client: "OpenAI", **kwargs):
+    """
+    client.chat.completions.create with a response cache.
+
+    Responses are keyed by a hash of the endpoint and every request argument
+    (model, messages, tools, temperature, ...), so an identical
+    deterministic request is answered without an API round-trip. Streaming
+    requests and temperatures above CACHE_MAX_TEMPERATURE (the API default
+    is 1.0) always go to the API.
+    """
+    if kwargs.get("stream") or kwargs.get("temperature", 1.0) > CACHE_MAX_TEMPERATURE:
+        return client.chat.completions.create(**kwargs)
+
+    digest = hashlib.blake2b(str(client.base_url).encode(), digest_size=16)
+    digest.update(fastjson.dumps(kwargs, default=_jsonable))
+    key = digest.hexdigest()
+
+    response = _response_cache.get(key)
+    if response is not None:
+        if diskcache is None:
+            _response_cache.move_to_end(key)
+        return response
+
+    response = client.chat.completions.create(**kwargs)
+    _response_cache[key] = response
+    if diskcache is None and len(_response_cache) > _MEMORY_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+    return response
+
+
+# Buffered characters written to stdout per flush while streaming
+STREAM_FLUSH_CHARS = 64
 
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
-
-
-# Initialize client for Inception Labs
-inception_api_key, _ = load_api_keys()
-client = OpenAI(
-    api_key=inception_api_key,
-    base_url="https://api.inceptionlabs.ai/v1"
-)
+
+def print_stream(stream) -> str:
+    """
+    Print a streamed completion as it arrives and return the full text.
+
+    Tokens are written in batches of about STREAM_FLUSH_CHARS characters
+    rather than one write and flush per token.
+    """
+    parts = []
+    flushed = pending = 0
+
+    for chunk in stream:
+        if not chunk.choices or chunk.choices[0].delta.content is None:
+            continue
+        parts.append(chunk.choices[0].delta.content)
+        pending += len(chunk.choices[0].delta.content)
+
+        if pending >= STREAM_FLUSH_CHARS:
+            sys.stdout.write("".join(parts[flushed:]))
+            sys.stdout.flush()
+            flushed, pending = len(parts), 0
+
+    sys.stdout.write("".join(parts[flushed:]))
+    sys.stdout.flush()
+    return "".join(parts)
 
 
 # Example 1: Basic Chat Completion
@@ -51,16 +119,20 @@ def basic_chat_example():
     """Simple chat completion example."""
     print("=== Example 1: Basic Chat Completion ===\n")
 
-    completion = client.chat.completions.create(
+    client = get_client()
+
+    # Stream so the first tokens print as soon as they are generated
+    stream = client.chat.completions.create(
         model="mercury",
         messages=[
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Write a haiku about recursion in programming."}
-        ]
+        ],
+        stream=True
     )
 
-    print(completion.choices[0].message.content)
-    print()
+    print_stream(stream)
+    print("\n")
 
 
 # Example 2: Streaming Response
@@ -68,6 +140,8 @@ def streaming_example():
     """Stream the response token by token."""
     print("=== Example 2: Streaming Response ===\n")
 
+    client = get_client()
+
     stream = client.chat.completions.create(
         model="mercury",
         messages=[
@@ -78,9 +152,7 @@ def streaming_example():
     )
 
     print("Streaming: ", end="", flush=True)
-    for chunk in stream:
-        if chunk.choices[0].delta.content is not None:
-            print(chunk.choices[0].delta.content, end="", flush=True)
+    print_stream(stream)
     print("\n")
 
 
@@ -89,6 +161,8 @@ def function_calling_example():
     """Demonstrate function calling (tool usage)."""
     print("=== Example 3: Function Calling ===\n")
 
+    client = get_client()
+
     # Define the tools/functions
     tools = [
         {
@@ -167,6 +241,8 @@ def conversation_example():
     """Build a multi-turn conversation."""
     print("=== Example 4: Multi-turn Conversation ===\n")
 
+    client = get_client()
+
     messages = [
         {"role": "system", "content": "You are a helpful assistant."}
     ]
@@ -199,6 +275,8 @@ def system_prompt_example():
     """Show how different system prompts affect responses."""
     print("=== Example 5: System Prompt Variations ===\n")
 
+    client = get_client()
+
     question = "Explain quantum computing"
 
     # Default assistant
@@ -233,11 +311,14 @@ def temperature_example():
     """Demonstrate temperature parameter effects."""
     print("=== Example 6: Temperature Control ===\n")
 
+    client = get_client()
+
     prompt = "Write a creative story opening in one sentence."
 
     # Low temperature (more deterministic)
     print("🧊 Low Temperature (0.2) - More focused:")
-    response = client.chat.completions.create(
+    response = cached_completion(
+        client,
         model="mercury",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.2
@@ -261,6 +342,8 @@ def json_mode_example():
     """Request structured JSON output."""
     print("=== Example 7: Structured JSON Output ===\n")
 
+    client = get_client()
+
     response = client.chat.completions.create(
         model="mercury",
         messages=[
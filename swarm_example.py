@@ -1,113 +1,272 @@
+import hashlib
+import io
+import operator
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import count
+
+import httpx
 from dotenv import load_dotenv
 from swarm import Swarm, Agent
 from openai import OpenAI
 
+import fastjson
+from keyloader import load_inception_key_pool
+from memory import SemanticCache, trim
+
 # Load environment variables
 load_dotenv()
 
 
-def load_api_keys():
-    """Load API keys from .key file or environment variables."""
-    inception_key = None
-    openai_key = None
+class FastJSONClient(httpx.Client):
+    """httpx client that encodes json= request bodies with fastjson (orjson when available)."""
 
-    try:
-        with open('.key', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line.startswith('#Inseption labs API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        inception_key = lines[i + 1].strip()
-                elif line.startswith('#OpenAI API key'):
-                    # Next line should be the key
-                    if i + 1 < len(lines):
-                        openai_key = lines[i + 1].strip()
-    except FileNotFoundError:
-        pass
-
-    # Fall back to environment variables if not found in file
-    if not inception_key:
-        inception_key = os.getenv("INCEPTION_API_KEY")
-    if not openai_key:
-        openai_key = os.getenv("OPENAI_API_KEY")
-
-    return inception_key, openai_key
+    def build_request(self, method, url, *, json=None, **kwargs):
+        if json is not None:
+            headers = httpx.Headers(kwargs.get("headers"))
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+            kwargs["content"] = fastjson.dumps(json)
+        return super().build_request(method, url, **kwargs)
 
 
 # Initialize Swarm client with Inception Labs API
-def create_swarm_client():
-    """Create Swarm client configured for Inception Labs API."""
-    inception_api_key, _ = load_api_keys()
+def create_swarm_client(i: int = 0):
+    """
+    Return the Swarm client configured for Inception Labs API.
+
+    i selects the key from the configured key pool, wrapping around. Every
+    i that maps to the same key returns the same client, so all examples
+    share one client per key and its keep-alive connections.
+    """
+    return _swarm_client(i % (len(load_inception_key_pool()) or 1))
+
+
+@lru_cache(maxsize=None)
+def _http_client(index: int) -> httpx.Client:
+    """Pooled HTTP client behind the index-th key's Swarm client."""
+    return FastJSONClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+        timeout=60.0
+    )
+
+
+@lru_cache(maxsize=None)
+def _swarm_client(index: int):
+    """Build the Swarm client for the index-th pooled key."""
+    pool = load_inception_key_pool() or (None,)
+    inception_api_key = pool[index]
     inception_base_url = os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1")
 
     # Create OpenAI client pointing to Inception Labs
     client = OpenAI(
         api_key=inception_api_key,
-        base_url=inception_base_url
+        base_url=inception_base_url,
+        http_client=_http_client(index)
     )
 
     # Initialize Swarm with the custom client
     return Swarm(client=client)
 
 
+def warm_up_clients():
+    """
+    Open a connection for every pooled key ahead of the first request.
+
+    Sends a HEAD to the base URL on each key's HTTP client, concurrently, so
+    the first example does not pay the TCP + TLS handshake. The response
+    status does not matter and network errors are ignored.
+    """
+    inception_base_url = os.getenv("INCEPTION_BASE_URL", "https://api.inceptionlabs.ai/v1")
+
+    def probe(index):
+        try:
+            _http_client(index).head(inception_base_url, timeout=5.0)
+        except httpx.HTTPError:
+            pass
+
+    n = len(load_inception_key_pool()) or 1
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        list(executor.map(probe, range(n)))
+
+
+# Hands out pooled keys round-robin for the handoff example, so its
+# requests spread across the keys' rate limits
+_round_robin = count()
+
+# Agent instructions are interned, so every agent built from the same
+# prompt, in this module or any importer, shares one string object and
+# equality checks on it reduce to an identity comparison
+INSTRUCTIONS_SIMPLE = sys.intern("You are a helpful AI assistant.")
+
+# Sent unchanged ahead of every turn of the multi-turn example, so the
+# prompt prefix stays byte-identical and provider prompt caches can hit.
+# Add per-conversation context as separate messages, never by editing this.
+INSTRUCTIONS_MULTITURN = sys.intern("You are a helpful assistant that remembers context from previous messages.")
+
+# Shared by all of the tools example's queries, so each request starts with
+# the same system prefix
+INSTRUCTIONS_TOOLS = sys.intern("You are a helpful assistant with access to weather and calculation tools.")
+
+INSTRUCTIONS_TRIAGE = sys.intern("You are a triage agent. Determine if the user needs sales or support, then transfer them.")
+INSTRUCTIONS_SALES = sys.intern("You are a sales agent. Help users with pricing and product information.")
+INSTRUCTIONS_SUPPORT = sys.intern("You are a technical support agent. Help users troubleshoot issues.")
+
+
+@lru_cache(maxsize=1)
+def semantic_cache():
+    """
+    Return the shared semantic answer cache, or None when it is off.
+
+    Opt-in with SWARM_SEMANTIC_CACHE=1, since it only pays off when the
+    same or paraphrased prompts repeat within one process. Requires
+    sentence-transformers; embeddings are computed locally.
+    """
+    if os.getenv("SWARM_SEMANTIC_CACHE") != "1":
+        return None
+    try:
+        return SemanticCache()
+    except ImportError as e:
+        print(f"Semantic cache disabled: {e}")
+        return None
+
+
+def cached_run(agent: Agent, messages: list) -> str:
+    """
+    Run agent on messages and return the final reply text.
+
+    Replies are served from the semantic cache, when enabled, if an earlier
+    conversation with the same agent, model and instructions was similar
+    enough. Only use this for agents without tools, whose answers do not
+    hinge on details that similar wording can differ in.
+    """
+    cache = semantic_cache()
+    # Editing an agent's instructions must not serve answers cached for
+    # the old ones
+    instructions = hashlib.blake2b(str(agent.instructions).encode(), digest_size=8).hexdigest()
+    scope = f"{agent.name}:{agent.model}:{instructions}"
+
+    if cache:
+        cached = cache.get(scope, messages)
+        if cached is not None:
+            return cached
+
+    response = create_swarm_client().run(agent=agent, messages=messages)
+    content = response.messages[-1]['content']
+
+    if cache:
+        cache.put(scope, messages, content)
+    return content
+
+
+def run_streaming(agent: Agent, messages: list, out=sys.stdout) -> str:
+    """
+    Run agent on messages, writing the reply to out as it streams in.
+
+    Returns the full reply text once the stream ends.
+    """
+    chunks = []
+    for chunk in create_swarm_client().run(agent=agent, messages=messages, stream=True):
+        delta = chunk.get("content")
+        if delta:
+            out.write(delta)
+            out.flush()
+            chunks.append(delta)
+    return "".join(chunks)
+
+
+# Separator printed between examples
+_SEP = "\n" + "=" * 60 + "\n"
+
+
+# Arithmetic for the calculate tool; only the requested operation is evaluated
+_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": lambda a, b: a / b if b != 0 else "Error: Division by zero"
+}
+
+
+# Tool functions and agents for examples 2 and 4, built once at import (tool
+# schemas are introspected then) and shared by every call and thread
+def get_weather(location: str) -> str:
+    """Get the current weather for a location."""
+    # Mock weather data
+    return f"The weather in {location} is 72°F and Sunny."
+
+
+def calculate(operation: str, a: float, b: float) -> str:
+    """Perform mathematical calculations."""
+    op = _OPS.get(operation)
+    result = op(a, b) if op else "Unknown operation"
+    return f"{a} {operation} {b} = {result}"
+
+
+TOOLS_AGENT = Agent(
+    name="Assistant",
+    model="mercury",
+    instructions=INSTRUCTIONS_TOOLS,
+    functions=[get_weather, calculate]
+)
+
+SALES_AGENT = Agent(
+    name="Sales Agent",
+    model="mercury",
+    instructions=INSTRUCTIONS_SALES
+)
+
+SUPPORT_AGENT = Agent(
+    name="Support Agent",
+    model="mercury",
+    instructions=INSTRUCTIONS_SUPPORT
+)
+
+
+def transfer_to_sales():
+    """Transfer conversation to sales agent."""
+    return SALES_AGENT
+
+
+def transfer_to_support():
+    """Transfer conversation to support agent."""
+    return SUPPORT_AGENT
+
+
+TRIAGE_AGENT = Agent(
+    name="Triage Agent",
+    model="mercury",
+    instructions=INSTRUCTIONS_TRIAGE,
+    functions=[transfer_to_sales, transfer_to_support]
+)
+
+
 # Example 1: Simple Agent
-def simple_agent_example():
-    print("=== Simple Agent Example ===\n")
+def simple_agent_example(out=sys.stdout):
+    print("=== Simple Agent Example ===\n", file=out)
 
     # Create agent
     agent = Agent(
         name="Assistant",
         model="mercury",
-        instructions="You are a helpful AI assistant."
+        instructions=INSTRUCTIONS_SIMPLE
     )
 
-    # Create Swarm client
-    client = create_swarm_client()
-
     # Run conversation
-    response = client.run(
-        agent=agent,
-        messages=[{"role": "user", "content": "What is the capital of France?"}]
+    reply = cached_run(
+        agent,
+        [{"role": "user", "content": "What is the capital of France?"}]
     )
 
-    print(f"User: What is the capital of France?")
-    print(f"Agent: {response.messages[-1]['content']}\n")
+    print(f"User: What is the capital of France?", file=out)
+    print(f"Agent: {reply}\n", file=out)
 
 
 # Example 2: Agent with Tools
-def agent_with_tools_example():
-    print("=== Agent with Tools Example ===\n")
-
-    # Define tool functions
-    def get_weather(location: str) -> str:
-        """Get the current weather for a location."""
-        # Mock weather data
-        return f"The weather in {location} is 72°F and Sunny."
-
-    def calculate(operation: str, a: float, b: float) -> str:
-        """Perform mathematical calculations."""
-        operations = {
-            "add": a + b,
-            "subtract": a - b,
-            "multiply": a * b,
-            "divide": a / b if b != 0 else "Error: Division by zero"
-        }
-        result = operations.get(operation, "Unknown operation")
-        return f"{a} {operation} {b} = {result}"
-
-    # Create agent with tools
-    agent = Agent(
-        name="Assistant",
-        model="mercury",
-        instructions="You are a helpful assistant with access to weather and calculation tools.",
-        functions=[get_weather, calculate]
-    )
-
-    # Create Swarm client
-    client = create_swarm_client()
+def agent_with_tools_example(out=sys.stdout):
+    print("=== Agent with Tools Example ===\n", file=out)
 
     # Test queries
     queries = [
@@ -116,28 +275,34 @@ def agent_with_tools_example():
         "What's 100 divided by 5?"
     ]
 
-    for query in queries:
-        response = client.run(
-            agent=agent,
+    def run_one(query):
+        response = create_swarm_client().run(
+            agent=TOOLS_AGENT,
             messages=[{"role": "user", "content": query}]
         )
-        print(f"User: {query}")
-        print(f"Agent: {response.messages[-1]['content']}\n")
+        return response.messages[-1]['content']
+
+    # The queries are independent, so run them concurrently; map() keeps
+    # replies in query order
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        replies = list(executor.map(run_one, queries))
+
+    for query, reply in zip(queries, replies):
+        print(f"User: {query}", file=out)
+        print(f"Agent: {reply}\n", file=out)
 
 
 # Example 3: Multi-turn Conversation with Context
-def multi_turn_conversation_example():
-    print("=== Multi-turn Conversation Example ===\n")
+def multi_turn_conversation_example(out=sys.stdout):
+    print("=== Multi-turn Conversation Example ===\n", file=out)
 
     agent = Agent(
         name="Assistant",
         model="mercury",
-        instructions="You are a helpful assistant that remembers context from previous messages."
+        instructions=INSTRUCTIONS_MULTITURN
     )
 
-    client = create_swarm_client()
-
-    # Build conversation with context
+    # Build conversation with context; only ever appended to
     messages = []
     queries = [
         "My name is Alice.",
@@ -147,52 +312,25 @@ def multi_turn_conversation_example():
 
     for query in queries:
         messages.append({"role": "user", "content": query})
-        response = client.run(agent=agent, messages=messages)
+
+        # Turns depend on each other, but each reply can print as it arrives
+        print(f"User: {query}", file=out)
+        print("Agent: ", end="", flush=True, file=out)
+        # Send a trimmed copy, so the bytes resent per turn stay bounded
+        # while the transcript itself stays append-only
+        reply = run_streaming(agent, trim(list(messages)), out)
+        print("\n", file=out)
 
         # Add assistant response to messages for context
         messages.append({
             "role": "assistant",
-            "content": response.messages[-1]['content']
+            "content": reply
         })
 
-        print(f"User: {query}")
-        print(f"Agent: {response.messages[-1]['content']}\n")
-
 
 # Example 4: Agent Handoff (Multi-Agent)
-def multi_agent_handoff_example():
-    print("=== Multi-Agent Handoff Example ===\n")
-
-    # Define transfer function
-    def transfer_to_sales():
-        """Transfer conversation to sales agent."""
-        return sales_agent
-
-    def transfer_to_support():
-        """Transfer conversation to support agent."""
-        return support_agent
-
-    # Create specialized agents
-    triage_agent = Agent(
-        name="Triage Agent",
-        model="mercury",
-        instructions="You are a triage agent. Determine if the user needs sales or support, then transfer them.",
-        functions=[transfer_to_sales, transfer_to_support]
-    )
-
-    sales_agent = Agent(
-        name="Sales Agent",
-        model="mercury",
-        instructions="You are a sales agent. Help users with pricing and product information."
-    )
-
-    support_agent = Agent(
-        name="Support Agent",
-        model="mercury",
-        instructions="You are a technical support agent. Help users troubleshoot issues."
-    )
-
-    client = create_swarm_client()
+def multi_agent_handoff_example(out=sys.stdout):
+    print("=== Multi-Agent Handoff Example ===\n", file=out)
 
     # Test handoff
     queries = [
@@ -200,32 +338,51 @@ def multi_agent_handoff_example():
         "I'm having trouble logging in."
     ]
 
-    for query in queries:
-        response = client.run(
-            agent=triage_agent,
+    def run_one(query, client):
+        return client.run(
+            agent=TRIAGE_AGENT,
             messages=[{"role": "user", "content": query}]
         )
-        print(f"User: {query}")
-        print(f"Active Agent: {response.agent.name}")
-        print(f"Response: {response.messages[-1]['content']}\n")
 
+    # A handoff happens inside one run() call, so keys rotate per query
+    clients = [create_swarm_client(next(_round_robin)) for _ in queries]
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        responses = list(executor.map(run_one, queries, clients))
 
-if __name__ == "__main__":
-    try:
-        print("OpenAI Swarm Framework with Inception Labs API\n")
-        print("=" * 60 + "\n")
+    for query, response in zip(queries, responses):
+        print(f"User: {query}", file=out)
+        print(f"Active Agent: {response.agent.name}", file=out)
+        print(f"Response: {response.messages[-1]['content']}\n", file=out)
 
-        # Run examples
-        simple_agent_example()
-        print("\n" + "=" * 60 + "\n")
 
-        agent_with_tools_example()
-        print("\n" + "=" * 60 + "\n")
-
-        multi_turn_conversation_example()
-        print("\n" + "=" * 60 + "\n")
+if __name__ == "__main__":
+    try:
+        warm_up_clients()
 
-        multi_agent_handoff_example()
+        print("OpenAI Swarm Framework with Inception Labs API\n")
+        print(_SEP[1:])
+
+        buffered = [
+            simple_agent_example,
+            agent_with_tools_example,
+            multi_agent_handoff_example
+        ]
+
+        # The examples are independent, so run them concurrently. The
+        # multi-turn example streams straight to stdout on this thread so
+        # its replies show from the first token; the others write to their
+        # own buffers, printed whole and in order afterwards, so output
+        # never interleaves.
+        buffers = [io.StringIO() for _ in buffered]
+        with ThreadPoolExecutor(max_workers=len(buffered)) as executor:
+            futures = [executor.submit(example, buffer) for example, buffer in zip(buffered, buffers)]
+
+            multi_turn_conversation_example()
+
+            for future, buffer in zip(futures, buffers):
+                future.result()
+                print(_SEP)
+                print(buffer.getvalue(), end="")
 
     except Exception as e:
         print(f"Error: {e}")